@@ -139,6 +139,62 @@ variable "ansible_roles_path" {
   description = "Path for Ansible roles"
 }
 
+# ========================================
+# Provisioner Profiling Variables
+# ========================================
+
+variable "profile_provisioners" {
+  type        = bool
+  default     = false
+  description = "Trace every shell provisioner command with timestamps (set by the action's profile_provisioners input)"
+}
+
+variable "profile_dir" {
+  type        = string
+  default     = "/tmp/packer-profile"
+  description = "Directory on the build instance where profiling traces are written"
+}
+
+# When profiling is enabled, shell provisioners are still run as their own
+# program (same shebang, options and $0), but BASH_ENV points bash scripts at
+# a startup file that turns on xtrace with a PS4 recording the epoch time,
+# provisioner label and line number of every command. The startup file
+# unsets BASH_ENV so that bash scripts started by the provisioner are not
+# traced, and scripts with a non-bash shebang run untraced (the inline
+# provisioners below use a bash inline_shebang for that reason). The PS4
+# expansions are escaped so they are evaluated for each traced command
+# rather than once when PS4 is assigned. An __exit__ marker closes each
+# script so that its last command also gets a duration.
+#
+# The trace is collected by printing it (gzip + base64, between markers) to
+# the build output, where the action picks it up. This works from the
+# error-cleanup-provisioner too, so failed builds keep their trace.
+locals {
+  profile_trace = "${var.profile_dir}/shell.trace"
+  profile_env   = "${var.profile_dir}/xtrace.bash"
+  profile_ps4   = "+\t\\$EPOCHREALTIME\t\\$${PROFILE_LABEL:-inline}\t\\$LINENO\t"
+
+  shell_execute_command = var.profile_provisioners ? join("; ", [
+    "chmod +x {{ .Path }}",
+    "mkdir -p ${var.profile_dir}",
+    "printf '%s\\n' 'unset BASH_ENV' 'PS4=\"${local.profile_ps4}\"' 'BASH_XTRACEFD=9' 'set -x' >${local.profile_env}",
+    "export {{ .Vars }}",
+    "BASH_ENV=${local.profile_env} {{ .Path }} 9>>${local.profile_trace}",
+    "rc=$?",
+    "printf '+\\t%s\\t%s\\t0\\t__exit__\\n' \"$(date +%s.%N)\" \"$${PROFILE_LABEL:-inline}\" >>${local.profile_trace}",
+    "exit $rc",
+  ]) : "chmod +x {{ .Path }}; {{ .Vars }} {{ .Path }}"
+
+  profile_collect_command = var.profile_provisioners ? join("; ", [
+    "if [ -f ${local.profile_trace} ]",
+    "then echo PACKER-PROFILE-TRACE-BEGIN",
+    "gzip -c ${local.profile_trace} | base64",
+    "echo PACKER-PROFILE-TRACE-END",
+    "rm -rf ${var.profile_dir}",
+    "fi",
+  ]) : "true"
+}
+
 # ========================================
 # OpenStack Source Configuration
 # ========================================
@@ -202,6 +258,9 @@ build {
 
   # Wait for cloud-init to complete
   provisioner "shell" {
+    execute_command  = local.shell_execute_command
+    inline_shebang   = "/bin/bash -e"
+    environment_vars = ["PROFILE_LABEL=cloud-init-wait"]
     inline = [
       "echo 'Waiting for cloud-init to complete...'",
       "cloud-init status --wait || true",
@@ -211,6 +270,9 @@ build {
 
   # Update system
   provisioner "shell" {
+    execute_command  = local.shell_execute_command
+    inline_shebang   = "/bin/bash -e"
+    environment_vars = ["PROFILE_LABEL=system-update"]
     inline = [
       "echo 'Updating system packages...'",
       "sudo apt-get update",
@@ -221,14 +283,19 @@ build {
 
   # Run baseline provisioning
   provisioner "shell" {
-    script = "${path.cwd}/provision/baseline.sh"
+    script          = "${path.cwd}/provision/baseline.sh"
+    execute_command = local.shell_execute_command
     environment_vars = [
-      "DISTRO=${var.distro}"
+      "DISTRO=${var.distro}",
+      "PROFILE_LABEL=baseline.sh"
     ]
   }
 
   # Cleanup before image creation
   provisioner "shell" {
+    execute_command  = local.shell_execute_command
+    inline_shebang   = "/bin/bash -e"
+    environment_vars = ["PROFILE_LABEL=cleanup"]
     inline = [
       "echo 'Cleaning up before image creation...'",
       "sudo apt-get autoremove -y",
@@ -243,6 +310,16 @@ build {
     ]
   }
 
+  # Collect the profiling trace before the instance is torn down, both
+  # after a successful run and when a provisioner fails
+  provisioner "shell" {
+    inline = [local.profile_collect_command]
+  }
+
+  error-cleanup-provisioner "shell" {
+    inline = [local.profile_collect_command]
+  }
+
   # Post-processors can be added here
   # post-processor "manifest" {
   #   output = "manifest.json"
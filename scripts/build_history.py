@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 The Linux Foundation
+
+"""Record build phase timings and detect regressions against history.
+
+Every run appends one JSON line with its phase timings to a per
+template x platform history file. The new run is then compared with the
+median of the most recent successful runs of the same combination, and any
+phase that grew beyond the configured threshold is reported as a
+regression. Runs whose build was retried are recorded but kept out of the
+baseline and not judged, since their total includes the failed attempts.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PHASES = ["bastion_boot", "bastion_join", "init", "build", "total"]
+
+
+def read_timings(path):
+    """Read ``phase=seconds`` lines written by the action steps."""
+    timings = {}
+    if not path or not Path(path).is_file():
+        return timings
+    with open(path, "r") as f:
+        for line in f:
+            phase, sep, value = line.strip().partition("=")
+            if not sep:
+                continue
+            try:
+                timings[phase] = float(value)
+            except ValueError:
+                continue
+    return timings
+
+
+def load_history(path):
+    """Load history records, skipping lines that cannot be parsed."""
+    records = []
+    if not Path(path).is_file():
+        return records
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def save_history(path, records, max_records):
+    """Write the most recent records back as JSON lines."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for record in records[-max_records:]:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def compute_baseline(records, combination, window):
+    """Return the median of each phase over recent successful, unretried runs."""
+    samples = {}
+    recent = [
+        r for r in records
+        if r.get("combination") == combination and r.get("status") == "success"
+        and r.get("attempts", 1) == 1
+    ][-window:]
+    for record in recent:
+        for phase, seconds in record.get("phases", {}).items():
+            samples.setdefault(phase, []).append(seconds)
+    return {
+        phase: {"median": statistics.median(values), "samples": len(values)}
+        for phase, values in samples.items()
+    }
+
+
+def compare(timings, baseline, threshold, min_delta, min_samples):
+    """Compare the current timings against the baseline for each phase."""
+    results = []
+    for phase in PHASES:
+        if phase not in timings:
+            continue
+        current = timings[phase]
+        result = {"phase": phase, "current": current, "baseline": None,
+                  "change_percent": None, "regression": False}
+        reference = baseline.get(phase)
+        if reference and reference["samples"] >= min_samples and reference["median"] > 0:
+            median = reference["median"]
+            change = (current - median) / median * 100
+            result["baseline"] = median
+            result["change_percent"] = round(change, 1)
+            result["regression"] = change > threshold and current - median > min_delta
+        results.append(result)
+    return results
+
+
+def render_markdown(combination, results, threshold):
+    """Render the phase comparison as a markdown table."""
+    lines = [f"## 📈 Build performance: `{combination}`", ""]
+    if not results:
+        lines.append("No phase timings were recorded for this run.")
+        return "\n".join(lines) + "\n"
+
+    lines.append(f"Regression threshold: +{threshold:g}% over the rolling median.")
+    lines.append("")
+    lines.append("| Phase | Current | Baseline | Change | |")
+    lines.append("| ----- | ------- | -------- | ------ | - |")
+    for result in results:
+        if result["baseline"] is None:
+            baseline, change, flag = "-", "-", "🆕"
+        else:
+            baseline = f"{result['baseline']:.0f}s"
+            change = f"{result['change_percent']:+.1f}%"
+            flag = "❌" if result["regression"] else "✅"
+        lines.append(
+            f"| {result['phase']} | {result['current']:.0f}s | {baseline} | {change} | {flag} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--history", required=True, help="JSON-lines history file")
+    parser.add_argument("--timings", required=True, help="File of phase=seconds lines")
+    parser.add_argument("--combination", required=True, help="Template x platform identifier")
+    parser.add_argument("--status", default="success", help="Status of the current build")
+    parser.add_argument("--run-id", default="", help="Identifier of the current run")
+    parser.add_argument("--attempts", type=int, default=1, help="Packer build attempts made")
+    parser.add_argument("--window", type=int, default=10, help="Successful runs in the baseline")
+    parser.add_argument("--min-samples", type=int, default=3, help="Runs needed before comparing")
+    parser.add_argument("--threshold", type=float, default=25.0, help="Allowed increase in percent")
+    parser.add_argument("--min-delta", type=float, default=30.0,
+                        help="Ignore regressions smaller than this many seconds")
+    parser.add_argument("--max-records", type=int, default=200, help="Records kept in the history")
+    parser.add_argument("--summary", help="Markdown file to append the comparison to")
+    parser.add_argument("--github-output", help="File to write regression outputs to")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit non-zero when a phase regressed")
+    args = parser.parse_args(argv)
+
+    timings = read_timings(args.timings)
+    records = load_history(args.history)
+
+    # Compare before appending so the run is not part of its own baseline.
+    # Failed and retried builds are recorded but not judged.
+    baseline = {}
+    if args.status == "success" and args.attempts == 1:
+        baseline = compute_baseline(records, args.combination, args.window)
+    results = compare(timings, baseline, args.threshold, args.min_delta, args.min_samples)
+
+    if timings:
+        records.append({
+            "timestamp": int(time.time()),
+            "run_id": args.run_id,
+            "combination": args.combination,
+            "status": args.status,
+            "attempts": args.attempts,
+            "phases": timings,
+        })
+        save_history(args.history, records, args.max_records)
+
+    markdown = render_markdown(args.combination, results, args.threshold)
+    if args.summary:
+        with open(args.summary, "a") as f:
+            f.write(markdown)
+    else:
+        sys.stdout.write(markdown)
+
+    regressions = [r["phase"] for r in results if r["regression"]]
+    if args.github_output:
+        with open(args.github_output, "a") as f:
+            f.write(f"regression={'true' if regressions else 'false'}\n")
+            f.write(f"regressed_phases={','.join(regressions)}\n")
+    if regressions:
+        print(f"::warning::Build phase regression for {args.combination}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 The Linux Foundation
+
+"""Pre-validate Packer template and varfile pairs before running packer.
+
+Every template and varfile is parsed once, then each pair is checked for:
+
+- HCL syntax errors in either file (error)
+- Variables without a default that no varfile or PKR_VAR_* sets (error)
+- Variables set in the varfile but not declared by the template (warning,
+  packer itself only warns about these)
+
+All problems are reported at once, and only the pairs without errors are
+written out for the real ``packer validate`` run.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+try:
+    import hcl2
+except ImportError:  # pragma: no cover - exercised when the action cannot install it
+    hcl2 = None
+
+
+class ParsedFile:
+    """Result of parsing one HCL or JSON file."""
+
+    def __init__(self, path, data=None, error=None):
+        self.path = path
+        self.data = data or {}
+        self.error = error
+
+
+def _name(key):
+    """Strip the quotes some python-hcl2 versions keep around block labels."""
+    return key.strip('"')
+
+
+def parse_file(path):
+    """Parse an HCL (or JSON varfile) and capture any syntax error."""
+    try:
+        with open(path, "r") as f:
+            if str(path).endswith(".json"):
+                return ParsedFile(path, json.load(f))
+            return ParsedFile(path, hcl2.load(f))
+    except OSError as e:
+        return ParsedFile(path, error=f"{path}: {e.strerror}")
+    except Exception as e:  # lark and json raise a variety of parse errors
+        line = getattr(e, "line", None) or getattr(e, "lineno", None)
+        column = getattr(e, "column", None) or getattr(e, "colno", None)
+        location = f"{path}:{line}:{column}" if line else str(path)
+        message = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+        return ParsedFile(path, error=f"{location}: syntax error: {message}")
+
+
+def declared_variables(parsed):
+    """Return {name: has_default} for the variable blocks of a template."""
+    variables = {}
+    for block in parsed.data.get("variable", []):
+        for key, body in block.items():
+            if key.startswith("__"):
+                continue
+            variables[_name(key)] = isinstance(body, dict) and "default" in body
+    return variables
+
+
+def assigned_variables(parsed):
+    """Return the names of the variables a varfile sets."""
+    return {_name(key) for key in parsed.data if not key.startswith("__")}
+
+
+def check_pair(template, varfile, extra_varfiles, environ):
+    """Return (errors, warnings) for a single template/varfile pair."""
+    errors = [p.error for p in (template, varfile) if p.error]
+    if errors:
+        return errors, []
+
+    declared = declared_variables(template)
+    assigned = assigned_variables(varfile)
+
+    provided = set(assigned)
+    for extra in extra_varfiles:
+        if not extra.error:
+            provided |= assigned_variables(extra)
+    provided |= {key[len("PKR_VAR_"):] for key in environ if key.startswith("PKR_VAR_")}
+
+    for name, has_default in sorted(declared.items()):
+        if not has_default and name not in provided:
+            errors.append(
+                f"{template.path}: required variable '{name}' is not set by {varfile.path}"
+            )
+
+    warnings = [
+        f"{varfile.path}: variable '{name}' is not declared in {template.path}"
+        for name in sorted(assigned - set(declared))
+    ]
+    return errors, warnings
+
+
+def read_pairs(path):
+    """Read tab separated varfile/template pairs."""
+    pairs = []
+    with open(path, "r") as f:
+        for line in f:
+            varfile, sep, template = line.rstrip("\n").partition("\t")
+            if sep:
+                pairs.append((varfile, template))
+    return pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", required=True, help="File of varfile<TAB>template lines")
+    parser.add_argument("--passed", required=True, help="File to write the pairs without errors to")
+    parser.add_argument("--extra-var-file", action="append", default=[],
+                        help="Varfile passed to every packer run (e.g. cloud-env)")
+    args = parser.parse_args(argv)
+
+    pairs = read_pairs(args.pairs)
+
+    if hcl2 is None:
+        print("::warning::python-hcl2 is not installed, skipping HCL pre-validation")
+        with open(args.passed, "w") as f:
+            f.writelines(f"{varfile}\t{template}\n" for varfile, template in pairs)
+        return 0
+
+    # Parse each file once, however many pairs it appears in
+    parsed = {}
+    for path in {p for pair in pairs for p in pair} | set(args.extra_var_file):
+        parsed[path] = parse_file(path)
+    extra_varfiles = [parsed[path] for path in args.extra_var_file]
+
+    passed = []
+    all_errors = []
+    all_warnings = []
+    for varfile, template in pairs:
+        # Plain JSON templates are left to packer
+        if not template.endswith(".pkr.hcl"):
+            passed.append((varfile, template))
+            continue
+        errors, warnings = check_pair(parsed[template], parsed[varfile], extra_varfiles, os.environ)
+        all_warnings.extend(w for w in warnings if w not in all_warnings)
+        if errors:
+            all_errors.extend(e for e in errors if e not in all_errors)
+        else:
+            passed.append((varfile, template))
+
+    for warning in all_warnings:
+        print(f"::warning::{warning}")
+    for error in all_errors:
+        print(f"::error::{error}")
+
+    with open(args.passed, "w") as f:
+        f.writelines(f"{varfile}\t{template}\n" for varfile, template in passed)
+
+    print(f"HCL pre-validation: {len(passed)}/{len(pairs)} pair(s) passed, "
+          f"{len(all_errors)} error(s), {len(all_warnings)} warning(s)")
+    return 1 if len(passed) < len(pairs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 The Linux Foundation
+
+"""Render a ranked "slowest steps" report from provisioner profiling data.
+
+Both sources are read from the packer build log:
+
+- Shell xtrace files printed by the template before the build VM is torn
+  down (gzip + base64 between ``PACKER-PROFILE-TRACE-*`` markers). Each
+  traced command is written as ``+<TAB>epoch<TAB>label<TAB>lineno<TAB>command``
+  by the profiling ``execute_command`` of the template, and every script
+  ends with an ``__exit__`` marker so the last command gets a duration too.
+- The task recap printed by the ``ansible.posix.profile_tasks`` callback.
+"""
+
+import argparse
+import base64
+import binascii
+import gzip
+import json
+import re
+import sys
+from pathlib import Path
+
+TRACE_RE = re.compile(r"^\++\t(\d+[.,]\d+)\t([^\t]*)\t(\d+)\t(.*)$")
+EXIT_MARKER = "__exit__"
+TRACE_BEGIN = "PACKER-PROFILE-TRACE-BEGIN"
+TRACE_END = "PACKER-PROFILE-TRACE-END"
+
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+PACKER_PREFIX_RE = re.compile(r"^(?:==> )?\s*[\w.-]+\.[\w.-]+: ")
+TASK_RE = re.compile(r"^(?P<name>.+?) -+ (?P<seconds>\d+\.\d+)s\s*$")
+
+
+def _log_lines(path):
+    """Yield build log lines without packer prefixes and colours."""
+    with open(path, "r", errors="replace") as f:
+        for line in f:
+            yield PACKER_PREFIX_RE.sub("", ANSI_RE.sub("", line.rstrip("\r\n")))
+
+
+def extract_traces(build_log):
+    """Return the decoded shell traces embedded in a build log."""
+    traces = []
+    encoded = None
+    for line in _log_lines(build_log):
+        line = line.strip()
+        if line == TRACE_BEGIN:
+            encoded = []
+        elif line == TRACE_END and encoded is not None:
+            try:
+                data = gzip.decompress(base64.b64decode("".join(encoded)))
+            except (binascii.Error, OSError, EOFError):
+                print(f"::warning::Skipping a corrupt profiling trace in {build_log}")
+            else:
+                traces.append(data.decode("utf-8", errors="replace"))
+            encoded = None
+        elif encoded is not None:
+            encoded.append(line)
+    return traces
+
+
+def parse_trace(text):
+    """Return per-command durations from the text of one xtrace file."""
+    records = []
+    for line in text.splitlines():
+        match = TRACE_RE.match(line)
+        if not match:
+            # Continuation lines of multi-line commands
+            continue
+        stamp, label, lineno, command = match.groups()
+        records.append((float(stamp.replace(",", ".")), label, int(lineno), command))
+
+    steps = []
+    for current, following in zip(records, records[1:]):
+        stamp, label, lineno, command = current
+        if command == EXIT_MARKER:
+            continue
+        steps.append({
+            "source": "shell",
+            "label": label or "inline",
+            "line": lineno,
+            "command": command,
+            "duration": round(max(following[0] - stamp, 0.0), 3),
+        })
+    return steps
+
+
+def parse_ansible_recap(path):
+    """Return per-task durations from profile_tasks recaps in a build log."""
+    steps = []
+    in_recap = False
+    for line in _log_lines(path):
+        if line.startswith("=" * 20):
+            in_recap = True
+            continue
+        if not in_recap:
+            continue
+        match = TASK_RE.match(line.strip())
+        if not match:
+            in_recap = False
+            continue
+        steps.append({
+            "source": "ansible",
+            "label": "profile_tasks",
+            "line": None,
+            "command": match.group("name").strip(),
+            "duration": float(match.group("seconds")),
+        })
+    return steps
+
+
+def build_report(build_log):
+    """Collect and rank all profiled steps, slowest first."""
+    steps = []
+    if Path(build_log).is_file():
+        for trace in extract_traces(build_log):
+            steps.extend(parse_trace(trace))
+        steps.extend(parse_ansible_recap(build_log))
+
+    steps.sort(key=lambda step: step["duration"], reverse=True)
+    for rank, step in enumerate(steps, start=1):
+        step["rank"] = rank
+
+    return {
+        "total_steps": len(steps),
+        "total_duration": round(sum(step["duration"] for step in steps), 3),
+        "steps": steps,
+    }
+
+
+def render_markdown(report, top):
+    """Render the slowest steps of a report as a markdown table."""
+    lines = ["## 🐢 Slowest provisioner steps", ""]
+    if not report["steps"]:
+        lines.append("No provisioner profiling data was collected.")
+        return "\n".join(lines) + "\n"
+
+    lines.append(
+        f"Profiled {report['total_steps']} step(s) taking "
+        f"{report['total_duration']:.1f}s in total."
+    )
+    lines.append("")
+    lines.append("| Rank | Duration | Source | Step |")
+    lines.append("| ---- | -------- | ------ | ---- |")
+    for step in report["steps"][:top]:
+        where = step["label"]
+        if step["line"] is not None:
+            where = f"{where}:{step['line']}"
+        command = step["command"].replace("|", "\\|")
+        if len(command) > 80:
+            command = command[:77] + "..."
+        lines.append(
+            f"| {step['rank']} | {step['duration']:.2f}s | {step['source']} "
+            f"| `{where}` {command} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--build-log", required=True,
+                        help="Packer build log containing the traces and profile_tasks output")
+    parser.add_argument("--output", required=True, help="Path of the JSON report to write")
+    parser.add_argument("--summary", help="Markdown file to append the report to")
+    parser.add_argument("--top", type=int, default=20, help="Number of steps in the summary")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.build_log)
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    markdown = render_markdown(report, args.top)
+    if args.summary:
+        with open(args.summary, "a") as f:
+            f.write(markdown)
+    else:
+        sys.stdout.write(markdown)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
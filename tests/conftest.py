@@ -3,6 +3,9 @@
 
 """Pytest configuration and fixtures for action tests."""
 
+import importlib.util
+from pathlib import Path
+
 import pytest
 
 
@@ -31,3 +34,14 @@ def mock_secrets():
         "TAILSCALE_AUTH_KEY": "tskey-auth-test",
         "CLOUD_ENV_JSON_B64": "eyJ0ZXN0IjogInZhbHVlIn0=",  # base64: {"test": "value"}
     }
+
+
+@pytest.fixture
+def load_script():
+    """Return a loader for the Python helpers in scripts/."""
+    def load(name):
+        spec = importlib.util.spec_from_file_location(name, Path("scripts") / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return load
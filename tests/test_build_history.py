@@ -0,0 +1,169 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 The Linux Foundation
+
+"""Tests for the build performance history script."""
+
+import json
+
+import pytest
+import yaml
+
+
+@pytest.fixture
+def history(load_script):
+    """Load scripts/build_history.py."""
+    return load_script("build_history")
+
+
+def write_history(path, builds, combination="builder-ubuntu-22.04", status="success"):
+    """Write history records with the given build phase durations."""
+    with open(path, "w") as f:
+        for i, build in enumerate(builds):
+            record = {
+                "timestamp": i,
+                "run_id": str(i),
+                "combination": combination,
+                "status": status,
+                "phases": {"init": 10, "build": build},
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+def run(history, tmp_path, build, *extra):
+    """Run the CLI for a build with the given duration."""
+    timings = tmp_path / "phase-timings.env"
+    timings.write_text(f"init=10\nbuild={build}\nnot a timing\n")
+    github_output = tmp_path / "github-output"
+    code = history.main([
+        "--history", str(tmp_path / "history.jsonl"),
+        "--timings", str(timings),
+        "--combination", "builder-ubuntu-22.04",
+        "--summary", str(tmp_path / "summary.md"),
+        "--github-output", str(github_output),
+        *extra,
+    ])
+    return code, github_output.read_text()
+
+
+def test_read_timings(history, tmp_path):
+    """Test that phase=seconds lines are parsed and junk is ignored."""
+    timings = tmp_path / "phase-timings.env"
+    timings.write_text("bastion_boot=42\nbuild=oops\n\ntotal=100\n")
+
+    assert history.read_timings(timings) == {"bastion_boot": 42.0, "total": 100.0}
+
+
+def test_baseline_uses_recent_successful_runs(history, tmp_path):
+    """Test that the baseline only uses successful runs of the same combination."""
+    path = tmp_path / "history.jsonl"
+    write_history(path, [100, 200, 300, 400])
+    with open(path, "a") as f:
+        f.write(json.dumps({"combination": "other", "status": "success",
+                            "phases": {"build": 9999}}) + "\n")
+        f.write(json.dumps({"combination": "builder-ubuntu-22.04", "status": "failure",
+                            "phases": {"build": 9999}}) + "\n")
+        f.write("{truncated\n")
+
+    records = history.load_history(path)
+    baseline = history.compute_baseline(records, "builder-ubuntu-22.04", window=3)
+
+    assert baseline["build"] == {"median": 300, "samples": 3}
+
+
+def test_regression_detected(history, tmp_path):
+    """Test that a phase beyond the threshold is flagged."""
+    write_history(tmp_path / "history.jsonl", [600, 610, 590])
+
+    code, output = run(history, tmp_path, 900)
+
+    assert code == 0
+    assert "regression=true" in output
+    assert "regressed_phases=build" in output
+    assert "❌" in (tmp_path / "summary.md").read_text()
+
+
+def test_fail_on_regression(history, tmp_path):
+    """Test that --fail-on-regression turns a regression into a failure."""
+    write_history(tmp_path / "history.jsonl", [600, 610, 590])
+
+    code, _ = run(history, tmp_path, 900, "--fail-on-regression")
+
+    assert code == 1
+
+
+def test_small_absolute_change_is_ignored(history, tmp_path):
+    """Test that short phases do not regress on a few seconds of noise."""
+    write_history(tmp_path / "history.jsonl", [10, 10, 10])
+
+    code, output = run(history, tmp_path, 20, "--fail-on-regression")
+
+    assert code == 0
+    assert "regression=false" in output
+
+
+def test_not_enough_history(history, tmp_path):
+    """Test that no regression is reported until enough runs exist."""
+    write_history(tmp_path / "history.jsonl", [100])
+
+    code, output = run(history, tmp_path, 900, "--fail-on-regression")
+
+    assert code == 0
+    assert "regression=false" in output
+
+
+def test_run_is_appended_and_history_is_compacted(history, tmp_path):
+    """Test that the current run is recorded and old records are dropped."""
+    write_history(tmp_path / "history.jsonl", [600] * 5)
+
+    run(history, tmp_path, 610, "--max-records", "3")
+
+    records = history.load_history(tmp_path / "history.jsonl")
+    assert len(records) == 3
+    assert records[-1]["phases"] == {"init": 10.0, "build": 610.0}
+
+
+def test_failed_build_is_not_judged(history, tmp_path):
+    """Test that failed builds are recorded without a regression verdict."""
+    write_history(tmp_path / "history.jsonl", [600, 610, 590])
+
+    code, output = run(history, tmp_path, 5000, "--status", "failure", "--fail-on-regression")
+
+    assert code == 0
+    assert "regression=false" in output
+    assert history.load_history(tmp_path / "history.jsonl")[-1]["status"] == "failure"
+
+
+def test_retried_build_is_not_judged(history, tmp_path):
+    """Test that a build that needed retries is recorded without a verdict."""
+    write_history(tmp_path / "history.jsonl", [600, 610, 590])
+
+    code, output = run(history, tmp_path, 5000, "--attempts", "2", "--fail-on-regression")
+
+    assert code == 0
+    assert "regression=false" in output
+    assert history.load_history(tmp_path / "history.jsonl")[-1]["attempts"] == 2
+
+
+def test_retried_builds_are_left_out_of_the_baseline(history, tmp_path):
+    """Test that only first-attempt successes feed the baseline."""
+    path = tmp_path / "history.jsonl"
+    write_history(path, [100, 200, 300])
+    with open(path, "a") as f:
+        f.write(json.dumps({"combination": "builder-ubuntu-22.04", "status": "success",
+                            "attempts": 3, "phases": {"build": 9999}}) + "\n")
+
+    baseline = history.compute_baseline(history.load_history(path), "builder-ubuntu-22.04", window=3)
+
+    assert baseline["build"] == {"median": 200, "samples": 3}
+
+
+def test_combination_is_known_before_the_bastion_starts():
+    """Test that history steps get a combination even if the bastion fails."""
+    with open("action.yaml", "r") as f:
+        steps = yaml.safe_load(f)["runs"]["steps"]
+
+    assert "PACKER_COMBINATION=" in steps[0]["run"]
+    history_steps = [s for s in steps if "build_history" in s.get("if", "")]
+    assert len(history_steps) == 3
+    for step in history_steps:
+        assert "env.PACKER_COMBINATION != ''" in step["if"]
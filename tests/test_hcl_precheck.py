@@ -0,0 +1,129 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 The Linux Foundation
+
+"""Tests for the in-process HCL pre-validation script."""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("hcl2")
+
+TEMPLATE = '''
+variable "flavor" {
+  type    = string
+  default = "v3-standard-2"
+}
+
+variable "base_image" {
+  type = string
+}
+
+source "openstack" "builder" {
+  flavor            = var.flavor
+  source_image_name = var.base_image
+}
+'''
+
+
+@pytest.fixture
+def precheck(load_script):
+    """Load scripts/hcl_precheck.py."""
+    return load_script("hcl_precheck")
+
+
+def run(precheck, tmp_path, pairs, *extra):
+    """Run the CLI on the given pairs and return the exit code and passed pairs."""
+    pairs_file = tmp_path / "pairs.tsv"
+    pairs_file.write_text("".join(f"{varfile}\t{template}\n" for varfile, template in pairs))
+    passed_file = tmp_path / "passed.tsv"
+    code = precheck.main(["--pairs", str(pairs_file), "--passed", str(passed_file), *extra])
+    return code, precheck.read_pairs(passed_file)
+
+
+def test_valid_pair_passes(precheck, tmp_path, capsys):
+    """Test that a complete pair is passed through without problems."""
+    (tmp_path / "builder.pkr.hcl").write_text(TEMPLATE)
+    (tmp_path / "ubuntu.pkrvars.hcl").write_text('base_image = "Ubuntu 22.04"\n')
+    pair = (str(tmp_path / "ubuntu.pkrvars.hcl"), str(tmp_path / "builder.pkr.hcl"))
+
+    code, passed = run(precheck, tmp_path, [pair])
+
+    assert code == 0
+    assert passed == [pair]
+    assert "::error::" not in capsys.readouterr().out
+
+
+def test_all_problems_reported_at_once(precheck, tmp_path, capsys):
+    """Test that syntax and missing variable errors are all reported together."""
+    (tmp_path / "builder.pkr.hcl").write_text(TEMPLATE)
+    (tmp_path / "broken.pkr.hcl").write_text('variable "x" {\n')
+    (tmp_path / "empty.pkrvars.hcl").write_text('flavor = "v3-standard-4"\n')
+    (tmp_path / "bad.pkrvars.hcl").write_text("flavor = \n")
+    pairs = [
+        (str(tmp_path / "empty.pkrvars.hcl"), str(tmp_path / "builder.pkr.hcl")),
+        (str(tmp_path / "empty.pkrvars.hcl"), str(tmp_path / "broken.pkr.hcl")),
+        (str(tmp_path / "bad.pkrvars.hcl"), str(tmp_path / "builder.pkr.hcl")),
+    ]
+
+    code, passed = run(precheck, tmp_path, pairs)
+
+    out = capsys.readouterr().out
+    assert code == 1
+    assert passed == []
+    assert "required variable 'base_image'" in out
+    assert "broken.pkr.hcl:2" in out
+    assert "bad.pkrvars.hcl:1" in out
+    assert "0/3 pair(s) passed" in out
+
+
+def test_undeclared_variable_is_a_warning(precheck, tmp_path, capsys):
+    """Test that undeclared varfile variables warn without blocking the pair."""
+    (tmp_path / "builder.pkr.hcl").write_text(TEMPLATE)
+    (tmp_path / "ubuntu.pkrvars.hcl").write_text('base_image = "Ubuntu"\nflavour = "typo"\n')
+    pair = (str(tmp_path / "ubuntu.pkrvars.hcl"), str(tmp_path / "builder.pkr.hcl"))
+
+    code, passed = run(precheck, tmp_path, [pair])
+
+    assert code == 0
+    assert passed == [pair]
+    assert "::warning::" in capsys.readouterr().out
+
+
+def test_required_variable_from_extra_varfile_or_env(precheck, tmp_path, monkeypatch):
+    """Test that cloud-env varfiles and PKR_VAR_* satisfy required variables."""
+    (tmp_path / "builder.pkr.hcl").write_text(TEMPLATE.replace(
+        'variable "base_image"', 'variable "cloud_auth_url" {\n  type = string\n}\n\nvariable "base_image"'
+    ))
+    (tmp_path / "ubuntu.pkrvars.hcl").write_text('flavor = "v3-standard-4"\n')
+    (tmp_path / "cloud-env.json").write_text('{"cloud_auth_url": "https://example.com:5000/v3"}')
+    monkeypatch.setenv("PKR_VAR_base_image", "Ubuntu 22.04")
+    pair = (str(tmp_path / "ubuntu.pkrvars.hcl"), str(tmp_path / "builder.pkr.hcl"))
+
+    code, passed = run(precheck, tmp_path, [pair],
+                       "--extra-var-file", str(tmp_path / "cloud-env.json"))
+
+    assert code == 0
+    assert passed == [pair]
+
+
+def test_json_templates_are_left_to_packer(precheck, tmp_path):
+    """Test that non-HCL templates are passed through unchecked."""
+    (tmp_path / "legacy.json").write_text("{not json")
+    (tmp_path / "ubuntu.pkrvars.hcl").write_text('base_image = "Ubuntu"\n')
+    pair = (str(tmp_path / "ubuntu.pkrvars.hcl"), str(tmp_path / "legacy.json"))
+
+    code, passed = run(precheck, tmp_path, [pair])
+
+    assert code == 0
+    assert passed == [pair]
+
+
+def test_example_templates_pass(precheck):
+    """Test that the shipped example template and varfile pass the pre-check."""
+    template = precheck.parse_file(Path("examples/templates/builder.pkr.hcl"))
+    varfile = precheck.parse_file(Path("examples/vars/ubuntu-22.04.pkrvars.hcl"))
+
+    errors, _ = precheck.check_pair(template, varfile, [], {})
+
+    assert errors == []
@@ -0,0 +1,213 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 The Linux Foundation
+
+"""Tests for the provisioner profiling report script."""
+
+import base64
+import gzip
+import json
+import re
+import subprocess
+from pathlib import Path
+
+import pytest
+
+TEMPLATE = Path("examples/templates/builder.pkr.hcl")
+
+TRACE = (
+    "+\t100.000\tbaseline.sh\t13\tsudo apt-get update\n"
+    "+\t130.500\tbaseline.sh\t17\tsudo apt-get install -y build-essential\n"
+    "continuation of a multi-line command\n"
+    "++\t190.000\tbaseline.sh\t60\tsudo timedatectl set-timezone UTC\n"
+    "+\t191,250\tbaseline.sh\t0\t__exit__\n"
+    "+\t200.000\tcleanup\t1\tsudo apt-get autoremove -y\n"
+    "+\t205.000\tcleanup\t0\t__exit__\n"
+)
+
+RECAP = (
+    "==> openstack.builder: Provisioning with Ansible...\n"
+    "    openstack.builder: TASK [common : Install packages] ****\n"
+    "    openstack.builder: Monday 19 October 2026  10:00:00 +0000 (0:00:42.100)       0:01:00.000 ****\n"
+    "    openstack.builder: ===============================================================================\n"
+    "    openstack.builder: common : Install packages ------------------------------------------ 42.10s\n"
+    "    openstack.builder: \x1b[0;32mcommon : Configure ntp ----------------------------------------- 3.05s\x1b[0m\n"
+    "    openstack.builder:\n"
+    "    openstack.builder: unrelated -- 1.00s after the recap\n"
+)
+
+
+@pytest.fixture
+def profile(load_script):
+    """Load scripts/provisioner_profile.py."""
+    return load_script("provisioner_profile")
+
+
+def embed_trace(text):
+    """Return build log lines as printed by the template's collect command."""
+    encoded = base64.encodebytes(gzip.compress(text.encode())).decode()
+    lines = ["PACKER-PROFILE-TRACE-BEGIN", *encoded.splitlines(), "PACKER-PROFILE-TRACE-END"]
+    return "".join(f"    openstack.builder: {line}\r\n" for line in lines)
+
+
+def render_local(name, variables):
+    """Render an HCL string local of the example template as packer would."""
+    content = TEMPLATE.read_text()
+    match = re.search(rf"^  {name}\s*=\s*(.*?)(?=^  \w+\s*=|^\}})", content, re.M | re.S)
+    expression = match.group(1).strip()
+    if expression.startswith("var.profile_provisioners ?"):
+        # Take the enabled branch: join("; ", [ ... ])
+        expression = expression[expression.index("["):expression.index("])") + 1]
+        strings = re.findall(r'"((?:[^"\\]|\\.)*)"', expression)
+        separator = "; "
+    else:
+        strings = [re.match(r'"((?:[^"\\]|\\.)*)"', expression).group(1)]
+        separator = ""
+
+    def unescape(string):
+        def replace(token):
+            if token.group("escape"):
+                return {"t": "\t", "n": "\n"}.get(token.group("escape"), token.group("escape"))
+            if token.group("literal"):
+                return "${"
+            return variables[token.group("reference")]
+        return re.sub(r"\\(?P<escape>.)|(?P<literal>\$\$\{)|\$\{(?P<reference>[\w.]+)\}",
+                      replace, string)
+
+    return separator.join(unescape(string) for string in strings)
+
+
+def test_parse_trace_durations(profile):
+    """Test that each command lasts until the next traced command."""
+    steps = profile.parse_trace(TRACE)
+
+    assert [step["command"] for step in steps] == [
+        "sudo apt-get update",
+        "sudo apt-get install -y build-essential",
+        "sudo timedatectl set-timezone UTC",
+        "sudo apt-get autoremove -y",
+    ]
+    assert [step["duration"] for step in steps] == [30.5, 59.5, 1.25, 5.0]
+    assert steps[0]["label"] == "baseline.sh"
+    assert steps[0]["line"] == 13
+
+
+def run_execute_command(tmp_path, content):
+    """Run a script through the template's profiling execute_command."""
+    script = tmp_path / "script.sh"
+    script.write_text(content)
+    variables = {
+        "var.profile_dir": str(tmp_path / "profile"),
+        "local.profile_trace": str(tmp_path / "profile" / "shell.trace"),
+        "local.profile_env": str(tmp_path / "profile" / "xtrace.bash"),
+    }
+    variables["local.profile_ps4"] = render_local("profile_ps4", variables)
+    command = render_local("shell_execute_command", variables)
+    command = command.replace("{{ .Path }}", str(script))
+    command = command.replace("{{ .Vars }}", "PROFILE_LABEL='script.sh'")
+
+    return subprocess.run(["sh", "-c", command], capture_output=True, text=True)
+
+
+def test_template_execute_command_traces_each_command(profile, tmp_path):
+    """Test the template's real execute_command against a script with two sleeps."""
+    result = run_execute_command(tmp_path, "#!/bin/bash\nsleep 0.3\necho done\nsleep 0.2\n")
+
+    assert result.returncode == 0, result.stderr
+    steps = [
+        step for step in profile.parse_trace((tmp_path / "profile" / "shell.trace").read_text())
+        if step["command"].startswith(("sleep", "echo"))
+    ]
+    assert [step["command"] for step in steps] == ["sleep 0.3", "echo done", "sleep 0.2"]
+    assert [step["line"] for step in steps] == [2, 3, 4]
+    assert {step["label"] for step in steps} == {"script.sh"}
+    assert steps[0]["duration"] >= 0.25
+    assert steps[1]["duration"] < 0.15
+    assert steps[2]["duration"] >= 0.15
+
+
+def test_template_execute_command_keeps_script_behaviour(tmp_path):
+    """Test that profiling keeps the shebang, $0 and the script's own options."""
+    result = run_execute_command(
+        tmp_path,
+        "#!/bin/bash\n"
+        "false\n"
+        'echo "$0 $(basename "$(dirname "$0")") $-"\n'
+        "bash -c 'echo child'\n",
+    )
+
+    assert result.returncode == 0, result.stderr
+    script, directory, options = result.stdout.splitlines()[0].split()
+    assert script == str(tmp_path / "script.sh")
+    assert directory == tmp_path.name
+    assert "e" not in options
+    # Only the provisioner script itself is traced, not bash it starts
+    trace = (tmp_path / "profile" / "shell.trace").read_text()
+    assert "\tbash -c 'echo child'" in trace
+    assert "\techo child" not in trace
+
+    result = run_execute_command(tmp_path, "#!/bin/sh\necho plain\nexit 3\n")
+
+    assert result.returncode == 3
+    assert result.stdout == "plain\n"
+
+
+def test_extract_traces_from_build_log(profile, tmp_path):
+    """Test that traces printed to the build log are decoded."""
+    log = tmp_path / "packer-build.log"
+    log.write_text("==> openstack.builder: Provisioning with shell script\n" + embed_trace(TRACE))
+
+    assert profile.extract_traces(log) == [TRACE]
+
+
+def test_parse_ansible_recap(profile, tmp_path):
+    """Test that profile_tasks recap lines are parsed from packer output."""
+    log = tmp_path / "packer-build.log"
+    log.write_text(RECAP)
+
+    steps = profile.parse_ansible_recap(log)
+
+    assert [(step["command"], step["duration"]) for step in steps] == [
+        ("common : Install packages", 42.1),
+        ("common : Configure ntp", 3.05),
+    ]
+
+
+def test_build_report_ranks_slowest_first(profile, tmp_path):
+    """Test that shell and ansible steps are merged and ranked."""
+    log = tmp_path / "packer-build.log"
+    log.write_text(RECAP + embed_trace(TRACE))
+
+    report = profile.build_report(log)
+
+    assert report["total_steps"] == 6
+    assert report["steps"][0]["command"] == "sudo apt-get install -y build-essential"
+    assert report["steps"][1]["source"] == "ansible"
+    assert [step["rank"] for step in report["steps"]] == list(range(1, 7))
+
+
+def test_main_writes_json_and_summary(profile, tmp_path):
+    """Test that the CLI writes the JSON artifact and markdown summary."""
+    log = tmp_path / "packer-build.log"
+    log.write_text(embed_trace(TRACE))
+    output = tmp_path / "out" / "provisioner-profile.json"
+    summary = tmp_path / "summary.md"
+
+    assert profile.main([
+        "--build-log", str(log),
+        "--output", str(output),
+        "--summary", str(summary),
+        "--top", "2",
+    ]) == 0
+
+    report = json.loads(output.read_text())
+    assert report["total_steps"] == 4
+    table_rows = [line for line in summary.read_text().splitlines() if line.startswith("| ")]
+    assert len(table_rows) == 4  # header, separator and 2 steps
+
+
+def test_missing_inputs_produce_empty_report(profile, tmp_path):
+    """Test that a build without profiling data still renders a report."""
+    report = profile.build_report(tmp_path / "missing.log")
+
+    assert report["steps"] == []
+    assert "No provisioner profiling data" in profile.render_markdown(report, 20)
@@ -0,0 +1,220 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 The Linux Foundation
+
+"""Tests for retrying packer build on transient failures.
+
+The build step of action.yaml is run in bash against a fake ``packer`` that
+prints a canned output per attempt.
+"""
+
+import os
+import re
+import subprocess
+from pathlib import Path
+
+import pytest
+import yaml
+
+PATTERNS = Path("scripts/transient-build-errors.txt")
+
+TERMINAL = (
+    "==> openstack.builder: Script exited with non-zero exit status: 2. Allowed exit codes are: [0]\n"
+    "Build 'openstack.builder' errored after 3 minutes: Script exited with non-zero exit status: 2\n"
+)
+SUCCESS = "Build 'openstack.builder' finished after 10 minutes.\n"
+
+
+def run_build_step(tmp_path, attempts, **inputs):
+    """Run the build step; attempts is a list of (output, exit code) per try."""
+    with open("action.yaml", "r") as f:
+        steps = yaml.safe_load(f)["runs"]["steps"]
+    step = next(s for s in steps if s.get("id") == "packer-operation")
+
+    workspace = tmp_path / "workspace"
+    (workspace / "logs").mkdir(parents=True)
+    values = {
+        "github.workspace": str(workspace),
+        "github.action_path": str(Path.cwd()),
+        "inputs.profile_provisioners": "false",
+        "inputs.build_retries": "2",
+        "inputs.build_retry_delay": "0",
+        "inputs.transient_error_patterns": "",
+        "inputs.packer_vars_file": "vars/ubuntu.pkrvars.hcl",
+        "inputs.packer_template": "templates/builder.pkr.hcl",
+        "env.BASTION_IP": "100.64.0.2",
+        "env.BASTION_NAME": "bastion-gh-1",
+    }
+    values.update({f"inputs.{key}": value for key, value in inputs.items()})
+    script = re.sub(r"\$\{\{ ([^}]*?) \}\}", lambda m: values[m.group(1)], step["run"])
+
+    # Fake packer (canned output per attempt) and sudo (tailscale status)
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for i, (output, code) in enumerate(attempts, start=1):
+        (tmp_path / f"output-{i}").write_text(output)
+        (tmp_path / f"code-{i}").write_text(str(code))
+    (bin_dir / "packer").write_text(
+        "#!/bin/bash\n"
+        f"n=$(( $(cat {tmp_path}/count 2>/dev/null || echo 0) + 1 ))\n"
+        f"echo $n > {tmp_path}/count\n"
+        f"cat {tmp_path}/output-$n\n"
+        f"exit $(cat {tmp_path}/code-$n)\n"
+    )
+    (bin_dir / "sudo").write_text("#!/bin/bash\necho '100.64.0.2 bastion-gh-1 linux -'\n")
+    for tool in bin_dir.iterdir():
+        tool.chmod(0o755)
+
+    github_output = tmp_path / "github-output"
+    timings = tmp_path / "phase-timings.env"
+    env = dict(
+        os.environ,
+        PATH=f"{bin_dir}:{os.environ['PATH']}",
+        PACKER_DIR=str(tmp_path),
+        GITHUB_OUTPUT=str(github_output),
+        PHASE_TIMINGS_FILE=str(timings),
+    )
+    result = subprocess.run(
+        ["bash", "--noprofile", "--norc", "-eo", "pipefail", "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    outputs = dict(line.split("=", 1) for line in github_output.read_text().splitlines())
+    return result, outputs, workspace / "logs", timings.read_text()
+
+
+def test_patterns_are_valid_regexes():
+    """Test that grep accepts every pattern."""
+    for line in PATTERNS.read_text().splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        result = subprocess.run(
+            ["grep", "-Eq", line, "/dev/null"],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode in (0, 1), f"Invalid pattern {line!r}: {result.stderr}"
+
+
+@pytest.mark.parametrize("output", [
+    "==> openstack.builder: Error waiting for SSH: ssh: handshake failed: read tcp 100.64.0.1:22: i/o timeout\n",
+    "==> openstack.builder: Timeout waiting for SSH.\n",
+    "==> openstack.builder: Error launching source server: Expected HTTP response code [202] when accessing [POST https://nova/servers], but got 403 instead\n"
+    "==> openstack.builder: {\"forbidden\": {\"message\": \"Quota exceeded for instances\"}}\n",
+    "==> openstack.builder: Expected HTTP response code [200] when accessing [GET https://nova/servers/abc], but got 503 instead\n",
+    "    openstack.builder: fatal: [default]: FAILED! => {\"msg\": \"Failed to update apt cache: Temporary failure resolving 'archive.ubuntu.com'\"}\n",
+])
+def test_transient_failure_is_retried(tmp_path, output):
+    """Test that known transient failures rerun the build on the same bastion."""
+    result, outputs, logs, timings = run_build_step(tmp_path, [(output, 1), (SUCCESS, 0)])
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert outputs == {"attempts": "2", "status": "success"}
+    assert "::warning::Transient packer build failure" in result.stdout
+
+
+@pytest.mark.parametrize("output", [
+    "==> openstack.builder: Error: Unsupported argument\n",
+    "    openstack.builder: E: Unable to locate package does-not-exist\n" + TERMINAL,
+    "Error: Failed preparing provisioner-block \"shell\" \"\": script not found: provision/missing.sh\n",
+])
+def test_terminal_failure_fails_fast(tmp_path, output):
+    """Test that terminal failures are not retried."""
+    result, outputs, _, _ = run_build_step(tmp_path, [(output, 1), (SUCCESS, 0)])
+
+    assert result.returncode == 1
+    assert outputs == {"attempts": "1", "status": "failure"}
+    assert "non-transient error, not retrying" in result.stdout
+
+
+@pytest.mark.parametrize("output", [
+    # Recovered output of an earlier provisioner
+    "==> openstack.builder: Provisioning with shell script: /tmp/packer-shell123\n"
+    "    openstack.builder: W: Failed to fetch http://archive.ubuntu.com  Temporary failure resolving 'archive.ubuntu.com'\n"
+    "    openstack.builder: curl: (28) Connection timed out after 5000 milliseconds\n"
+    "    openstack.builder: Rate limit reached, waiting 5s\n"
+    "==> openstack.builder: Provisioning with shell script: provision/baseline.sh\n"
+    "    openstack.builder: E: Unable to locate package does-not-exist\n"
+    + TERMINAL,
+    # Ansible task failure ignored with ignore_errors
+    "    openstack.builder: fatal: [default]: FAILED! => {\"msg\": \"Could not resolve host: mirror\"}\n"
+    "    openstack.builder: ...ignoring\n"
+    + TERMINAL,
+    # Ansible task failure handled by a rescue, then a real task failure
+    "==> openstack.builder: Provisioning with Ansible...\n"
+    "    openstack.builder: fatal: [default]: FAILED! => {\"msg\": \"Could not resolve host: mirror\"}\n"
+    "    openstack.builder: TASK [common : Fall back to the default mirror] ****\n"
+    "    openstack.builder: fatal: [default]: FAILED! => {\"msg\": \"No package matching 'does-not-exist' is available\"}\n"
+    "==> openstack.builder: Error executing Ansible: Non-zero exit status: exit status 2\n"
+    "Build 'openstack.builder' errored after 3 minutes: Error executing Ansible: Non-zero exit status: exit status 2\n",
+])
+def test_recovered_transient_output_does_not_mask_terminal_error(tmp_path, output):
+    """Test that transient-looking output of steps that recovered is ignored."""
+    result, outputs, _, _ = run_build_step(tmp_path, [(output, 1), (SUCCESS, 0)])
+
+    assert result.returncode == 1
+    assert outputs["attempts"] == "1"
+
+
+def test_failing_shell_command_output_is_classified(tmp_path):
+    """Test that a mirror hiccup in a shell provisioner is retried."""
+    output = (
+        "==> openstack.builder: Provisioning with shell script: /tmp/packer-shell123\n"
+        "    openstack.builder: Updating system packages...\n"
+        "    openstack.builder: Err:1 http://archive.ubuntu.com/ubuntu jammy InRelease\n"
+        "    openstack.builder:   Temporary failure resolving 'archive.ubuntu.com'\n"
+        "    openstack.builder: E: Failed to fetch http://archive.ubuntu.com/ubuntu/dists/jammy/InRelease  Temporary failure resolving 'archive.ubuntu.com'\n"
+        "    openstack.builder: E: Some index files failed to download. They have been ignored, or old ones used instead.\n"
+        "==> openstack.builder: Script exited with non-zero exit status: 100. Allowed exit codes are: [0]\n"
+        "Build 'openstack.builder' errored after 2 minutes: Script exited with non-zero exit status: 100\n"
+    )
+
+    result, outputs, _, _ = run_build_step(tmp_path, [(output, 1), (SUCCESS, 0)])
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert outputs == {"attempts": "2", "status": "success"}
+
+
+def test_retries_are_bounded(tmp_path):
+    """Test that a persistent transient failure stops after build_retries."""
+    transient = "==> openstack.builder: Timeout waiting for SSH.\n"
+
+    result, outputs, _, _ = run_build_step(tmp_path, [(transient, 1)] * 3, build_retries="2")
+
+    assert result.returncode == 1
+    assert outputs == {"attempts": "3", "status": "failure"}
+
+
+def test_retries_can_be_disabled(tmp_path):
+    """Test that build_retries=0 never retries."""
+    transient = "==> openstack.builder: Timeout waiting for SSH.\n"
+
+    result, outputs, _, _ = run_build_step(tmp_path, [(transient, 1), (SUCCESS, 0)], build_retries="0")
+
+    assert result.returncode == 1
+    assert outputs["attempts"] == "1"
+
+
+def test_caller_patterns_are_used(tmp_path):
+    """Test that transient_error_patterns extends the shipped list."""
+    output = "==> openstack.builder: Error: flaky image service hiccup\n"
+
+    result, outputs, _, _ = run_build_step(
+        tmp_path, [(output, 1), (SUCCESS, 0)],
+        transient_error_patterns="flaky image service\nsomething else",
+    )
+
+    assert result.returncode == 0
+    assert outputs["attempts"] == "2"
+
+
+def test_only_final_attempt_is_timed_and_logged(tmp_path):
+    """Test that timings and the build log only cover the successful attempt."""
+    transient = "==> openstack.builder: Timeout waiting for SSH.\n"
+
+    result, _, logs, timings = run_build_step(tmp_path, [(transient, 1), (SUCCESS, 0)])
+
+    assert result.returncode == 0
+    assert len(re.findall(r"^build=\d+$", timings, re.M)) == 1
+    assert (logs / "packer-build.log").read_text() == SUCCESS
+    assert (logs / "packer-build-attempt-1.log").read_text() == transient